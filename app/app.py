@@ -1,43 +1,147 @@
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, request, render_template
+import atexit
+import hashlib
 import logging
+import logging.handlers
+import os
+import queue
+import threading
+import fastjsonschema
+import orjson
 from app.database import (
-    init_db, create_task, get_all_tasks, get_task_by_id, 
+    configure, init_db, create_task, create_tasks, get_all_tasks_json, get_task_by_id, 
     update_task, delete_task
 )
 
-# Configure logging
+# Configure logging: request threads only enqueue records, and a background
+# listener thread does the file and console I/O.
+_log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+_file_handler = logging.FileHandler('app.log')
+_file_handler.setFormatter(_log_formatter)
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(_log_formatter)
+
+_log_queue = queue.Queue(-1)
+# QueueHandler formats the message before enqueueing it; keep that to the
+# bare message so the listener's handlers apply the real format only once.
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('app.log'),
-        logging.StreamHandler()
-    ]
+    format='%(message)s',
+    handlers=[logging.handlers.QueueHandler(_log_queue)]
+)
+_log_listener = logging.handlers.QueueListener(
+    _log_queue, _file_handler, _stream_handler, respect_handler_level=True
 )
+_log_listener.start()
+atexit.register(_log_listener.stop)
 
 logger = logging.getLogger(__name__)
 
+VALID_STATUSES = frozenset(('pending', 'in_progress', 'completed'))
+
+# Upper bound on POST /api/tasks/batch; a batch holds the write lock for
+# its whole insert loop.
+MAX_BATCH_SIZE = 100
+
+# Request body schemas, compiled once into plain Python validators. Blank
+# titles are rejected by the handlers, which strip the title once anyway.
+_CREATE_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'title': {'type': 'string'},
+        'description': {'type': ['string', 'null']},
+        'due_date': {'type': ['string', 'null']},
+        'status': {'enum': sorted(VALID_STATUSES), 'default': 'pending'},
+    },
+    'required': ['title'],
+}
+_UPDATE_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'title': {'type': ['string', 'null']},
+        'description': {'type': ['string', 'null']},
+        'due_date': {'type': ['string', 'null']},
+        'status': {'enum': sorted(VALID_STATUSES) + [None]},
+    },
+}
+_validate_create = fastjsonschema.compile(_CREATE_SCHEMA)
+_validate_update = fastjsonschema.compile(_UPDATE_SCHEMA)
+
+# Public error text for each (field, rule) a schema can fail on, so clients
+# never see the validator's internal messages.
+_VALID_STATUSES_MSG = 'Status must be one of: pending, in_progress, completed'
+_SCHEMA_ERROR_MESSAGES = {
+    ('data', 'type'): 'Request body must be a JSON object',
+    ('data', 'required'): 'Title is required',
+    ('data.title', 'type'): 'Title must be a string',
+    ('data.description', 'type'): 'Description must be a string',
+    ('data.due_date', 'type'): 'Due date must be a string',
+    ('data.status', 'enum'): _VALID_STATUSES_MSG,
+}
+
+def _schema_error_message(e, not_object_msg='Request body must be a JSON object'):
+    """Map a fastjsonschema failure to the API's error message.
+    
+    not_object_msg replaces the message used when the validated value
+    itself is not an object (e.g. a batch entry rather than the body).
+    """
+    if e.name == 'data' and e.rule == 'type':
+        return not_object_msg
+    if e.name == 'data.title' and e.value is None:
+        return 'Title is required'
+    return _SCHEMA_ERROR_MESSAGES.get((e.name, e.rule), 'Invalid request data')
+
 app = Flask(__name__, template_folder='../templates', static_folder='../static')
 
-# Initialize database on startup
-with app.app_context():
-    try:
-        init_db()
-        logger.info("Application started successfully")
-    except Exception as e:
-        logger.error(f"Failed to start application: {str(e)}")
-        raise
+def ojson(obj, status=200):
+    """Serialize obj with orjson and wrap it in a JSON response."""
+    return app.response_class(orjson.dumps(obj), status=status, mimetype='application/json')
+
+def _parse_json_body():
+    """Parse the request body with orjson, returning None if it is empty.
+    
+    Raises orjson.JSONDecodeError for a body that is not strict JSON
+    (orjson also rejects NaN, Infinity and out-of-range numbers).
+    """
+    raw = request.get_data(cache=False)
+    if not raw:
+        return None
+    return orjson.loads(raw)
 
 # Web Interface Routes
+# The page has no per-request context, so render it once per script root
+# (url_for() bakes SCRIPT_NAME into the static URLs) and reuse the bytes.
+# SCRIPT_NAME can come from client headers behind prefix-aware proxies, so
+# only the first INDEX_CACHE_MAX_ROOTS roots are cached; others are rendered
+# per request.
+INDEX_CACHE_MAX_ROOTS = 4
+_index_cache = {}
+_index_cache_lock = threading.Lock()
+
+def _rendered_index():
+    """Return the (html, etag) pair for the current script root."""
+    root = request.script_root
+    cached = _index_cache.get(root)
+    if cached is None:
+        html = render_template('index.html').encode('utf-8')
+        cached = (html, hashlib.md5(html, usedforsecurity=False).hexdigest())
+        with _index_cache_lock:
+            if len(_index_cache) < INDEX_CACHE_MAX_ROOTS:
+                _index_cache.setdefault(root, cached)
+    return cached
+
 @app.route('/')
 def index():
-    """Render the main page."""
+    """Serve the pre-rendered main page."""
     try:
-        logger.info("Rendering index page")
-        return render_template('index.html')
+        logger.debug("Serving index page")
+        html, etag = _rendered_index()
+        response = app.response_class(html, mimetype='text/html')
+        response.set_etag(etag)
+        return response.make_conditional(request)
     except Exception as e:
-        logger.error(f"Error rendering index page: {str(e)}")
-        return jsonify({'error': 'Internal server error'}), 500
+        logger.error("Error serving index page: %s", e)
+        return ojson({'error': 'Internal server error'}, 500)
 
 # API Routes
 
@@ -45,47 +149,96 @@ def index():
 def api_create_task():
     """Create a new task."""
     try:
-        data = request.get_json(force=True, silent=True)
+        try:
+            data = _parse_json_body()
+        except orjson.JSONDecodeError:
+            logger.warning("Create task: Invalid JSON")
+            return ojson({'error': 'Invalid JSON'}, 400)
         
         if not data:
             logger.warning("Create task: No JSON data provided")
-            return jsonify({'error': 'No data provided'}), 400
+            return ojson({'error': 'No data provided'}, 400)
         
-        title = data.get('title')
-        if not title or not title.strip():
+        try:
+            data = _validate_create(data)
+        except fastjsonschema.JsonSchemaException as e:
+            logger.warning("Create task: %s", e.message)
+            return ojson({'error': _schema_error_message(e)}, 400)
+        
+        title = data['title'].strip()
+        if not title:
             logger.warning("Create task: Title is required")
-            return jsonify({'error': 'Title is required'}), 400
+            return ojson({'error': 'Title is required'}, 400)
         
-        description = data.get('description')
-        due_date = data.get('due_date')
-        status = data.get('status', 'pending')
+        task = create_task(title, data.get('description'),
+                           data.get('due_date'), data['status'])
         
-        # Validate status
-        valid_statuses = ['pending', 'in_progress', 'completed']
-        if status not in valid_statuses:
-            logger.warning(f"Create task: Invalid status '{status}'")
-            return jsonify({'error': f'Status must be one of: {", ".join(valid_statuses)}'}), 400
+        logger.debug("Task created successfully: ID %s", task['id'])
+        return ojson(task, 201)
         
-        task_id = create_task(title.strip(), description, due_date, status)
-        task = get_task_by_id(task_id)
+    except Exception as e:
+        logger.error("Error creating task: %s", e)
+        return ojson({'error': 'Internal server error'}, 500)
+
+@app.route('/api/tasks/batch', methods=['POST'])
+def api_create_tasks_bulk():
+    """Create several tasks in a single request and transaction."""
+    try:
+        try:
+            data = _parse_json_body()
+        except orjson.JSONDecodeError:
+            logger.warning("Create tasks batch: Invalid JSON")
+            return ojson({'error': 'Invalid JSON'}, 400)
+        
+        if not isinstance(data, dict) or not data.get('tasks'):
+            logger.warning("Create tasks batch: No tasks provided")
+            return ojson({'error': 'No tasks provided'}, 400)
+        
+        entries = data['tasks']
+        if not isinstance(entries, list):
+            logger.warning("Create tasks batch: 'tasks' is not a list")
+            return ojson({'error': 'Tasks must be a list'}, 400)
+        
+        if len(entries) > MAX_BATCH_SIZE:
+            logger.warning("Create tasks batch: %s tasks exceeds limit", len(entries))
+            return ojson({'error': f'Batch cannot contain more than {MAX_BATCH_SIZE} tasks'}, 400)
         
-        logger.info(f"Task created successfully: ID {task_id}")
-        return jsonify(task), 201
+        rows = []
+        for index, entry in enumerate(entries):
+            try:
+                entry = _validate_create(entry)
+            except fastjsonschema.JsonSchemaException as e:
+                logger.warning("Create tasks batch: Task %s: %s", index, e.message)
+                message = _schema_error_message(e, 'Task must be a JSON object')
+                return ojson({'error': f'Task {index}: {message}'}, 400)
+            
+            title = entry['title'].strip()
+            if not title:
+                logger.warning("Create tasks batch: Task %s title is required", index)
+                return ojson({'error': f'Task {index}: Title is required'}, 400)
+            
+            rows.append((title, entry.get('description'),
+                         entry.get('due_date'), entry['status']))
+        
+        tasks = create_tasks(rows)
+        
+        logger.debug("Created %s tasks via batch API", len(tasks))
+        return ojson(tasks, 201)
         
     except Exception as e:
-        logger.error(f"Error creating task: {str(e)}")
-        return jsonify({'error': 'Internal server error'}), 500
+        logger.error("Error creating tasks in batch: %s", e)
+        return ojson({'error': 'Internal server error'}, 500)
 
 @app.route('/api/tasks', methods=['GET'])
 def api_get_all_tasks():
     """Get all tasks."""
     try:
-        tasks = get_all_tasks()
-        logger.info(f"Retrieved {len(tasks)} tasks via API")
-        return jsonify(tasks), 200
+        payload = get_all_tasks_json()
+        logger.debug("Retrieved tasks via API")
+        return app.response_class(payload, status=200, mimetype='application/json')
     except Exception as e:
-        logger.error(f"Error retrieving tasks: {str(e)}")
-        return jsonify({'error': 'Internal server error'}), 500
+        logger.error("Error retrieving tasks: %s", e)
+        return ojson({'error': 'Internal server error'}, 500)
 
 @app.route('/api/tasks/<int:task_id>', methods=['GET'])
 def api_get_task(task_id):
@@ -93,55 +246,55 @@ def api_get_task(task_id):
     try:
         task = get_task_by_id(task_id)
         if task is None:
-            logger.warning(f"Task {task_id} not found")
-            return jsonify({'error': 'Task not found'}), 404
+            logger.warning("Task %s not found", task_id)
+            return ojson({'error': 'Task not found'}, 404)
         
-        logger.info(f"Retrieved task {task_id} via API")
-        return jsonify(task), 200
+        logger.debug("Retrieved task %s via API", task_id)
+        return ojson(task, 200)
     except Exception as e:
-        logger.error(f"Error retrieving task {task_id}: {str(e)}")
-        return jsonify({'error': 'Internal server error'}), 500
+        logger.error("Error retrieving task %s: %s", task_id, e)
+        return ojson({'error': 'Internal server error'}, 500)
 
 @app.route('/api/tasks/<int:task_id>', methods=['PUT'])
 def api_update_task(task_id):
     """Update an existing task."""
     try:
-        data = request.get_json(force=True, silent=True)
+        try:
+            data = _parse_json_body()
+        except orjson.JSONDecodeError:
+            logger.warning("Update task %s: Invalid JSON", task_id)
+            return ojson({'error': 'Invalid JSON'}, 400)
         
         if not data:
-            logger.warning(f"Update task {task_id}: No JSON data provided")
-            return jsonify({'error': 'No data provided'}), 400
+            logger.warning("Update task %s: No JSON data provided", task_id)
+            return ojson({'error': 'No data provided'}, 400)
         
-        title = data.get('title')
-        description = data.get('description')
-        due_date = data.get('due_date')
-        status = data.get('status')
+        try:
+            data = _validate_update(data)
+        except fastjsonschema.JsonSchemaException as e:
+            logger.warning("Update task %s: %s", task_id, e.message)
+            return ojson({'error': _schema_error_message(e)}, 400)
         
-        # Validate status if provided
-        if status is not None:
-            valid_statuses = ['pending', 'in_progress', 'completed']
-            if status not in valid_statuses:
-                logger.warning(f"Update task {task_id}: Invalid status '{status}'")
-                return jsonify({'error': f'Status must be one of: {", ".join(valid_statuses)}'}), 400
-        
-        # Validate title if provided
-        if title is not None and not title.strip():
-            logger.warning(f"Update task {task_id}: Title cannot be empty")
-            return jsonify({'error': 'Title cannot be empty'}), 400
+        title = data.get('title')
+        if title is not None:
+            title = title.strip()
+            if not title:
+                logger.warning("Update task %s: Title cannot be empty", task_id)
+                return ojson({'error': 'Title cannot be empty'}, 400)
         
-        success = update_task(task_id, title, description, due_date, status)
+        task = update_task(task_id, title, data.get('description'),
+                           data.get('due_date'), data.get('status'))
         
-        if not success:
-            logger.warning(f"Task {task_id} not found for update")
-            return jsonify({'error': 'Task not found'}), 404
+        if task is None:
+            logger.warning("Task %s not found for update", task_id)
+            return ojson({'error': 'Task not found'}, 404)
         
-        task = get_task_by_id(task_id)
-        logger.info(f"Task {task_id} updated successfully via API")
-        return jsonify(task), 200
+        logger.debug("Task %s updated successfully via API", task_id)
+        return ojson(task, 200)
         
     except Exception as e:
-        logger.error(f"Error updating task {task_id}: {str(e)}")
-        return jsonify({'error': 'Internal server error'}), 500
+        logger.error("Error updating task %s: %s", task_id, e)
+        return ojson({'error': 'Internal server error'}, 500)
 
 @app.route('/api/tasks/<int:task_id>', methods=['DELETE'])
 def api_delete_task(task_id):
@@ -150,27 +303,48 @@ def api_delete_task(task_id):
         success = delete_task(task_id)
         
         if not success:
-            logger.warning(f"Task {task_id} not found for deletion")
-            return jsonify({'error': 'Task not found'}), 404
+            logger.warning("Task %s not found for deletion", task_id)
+            return ojson({'error': 'Task not found'}, 404)
         
-        logger.info(f"Task {task_id} deleted successfully via API")
-        return jsonify({'message': 'Task deleted successfully'}), 200
+        logger.debug("Task %s deleted successfully via API", task_id)
+        return ojson({'message': 'Task deleted successfully'}, 200)
         
     except Exception as e:
-        logger.error(f"Error deleting task {task_id}: {str(e)}")
-        return jsonify({'error': 'Internal server error'}), 500
+        logger.error("Error deleting task %s: %s", task_id, e)
+        return ojson({'error': 'Internal server error'}, 500)
 
 @app.errorhandler(404)
 def not_found(error):
     """Handle 404 errors."""
-    logger.warning(f"404 error: {request.url}")
-    return jsonify({'error': 'Resource not found'}), 404
+    logger.warning("404 error: %s", request.url)
+    return ojson({'error': 'Resource not found'}, 404)
 
 @app.errorhandler(500)
 def internal_error(error):
     """Handle 500 errors."""
-    logger.error(f"500 error: {str(error)}")
-    return jsonify({'error': 'Internal server error'}), 500
+    logger.error("500 error: %s", error)
+    return ojson({'error': 'Internal server error'}, 500)
+
+def create_app(db_path: str = 'tasks.db') -> Flask:
+    """Point the app at db_path, initialize the database and return the app.
+    
+    This configures the module-level app and the process-wide database state
+    rather than building a new app; importing app.app:app directly also works
+    and initializes the default database lazily on first use.
+    """
+    configure(db_path)
+    try:
+        init_db()
+        logger.info("Application started successfully")
+    except Exception as e:
+        logger.error("Failed to start application: %s", e)
+        raise
+    return app
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    # Only the debug server runs from here: importing serve.py would load this
+    # module a second time under its package name.
+    if not os.getenv('DEV_RELOAD'):
+        raise SystemExit("Start the server with 'python run.py' or 'python serve.py', "
+                         "or set DEV_RELOAD=1 to use Flask's debug server.")
+    create_app().run(debug=True, host='0.0.0.0', port=5000)
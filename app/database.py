@@ -1,36 +1,212 @@
 import sqlite3
 import logging
+import atexit
+import threading
+import time
 from contextlib import contextmanager
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, Tuple
 
 logger = logging.getLogger(__name__)
 
 DATABASE_PATH = 'tasks.db'
 
+# Applied to every new connection. WAL journaling and mmap only matter for
+# on-disk databases, so the file-backed pragmas are skipped for ':memory:'.
+_CONNECTION_PRAGMAS = (
+    'PRAGMA foreign_keys=ON',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA cache_size=-20000',
+)
+_FILE_PRAGMAS = (
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA mmap_size=134217728',
+)
+
+# Size of the per-connection prepared statement cache. Hot queries are kept
+# as module-level constants so repeated calls hit the cache.
+STATEMENT_CACHE_SIZE = 256
+
+_TASK_COLUMNS = 'id, title, description, due_date, status'
+_SQL_INSERT = (
+    'INSERT INTO tasks (title, description, due_date, status) VALUES (?, ?, ?, ?) '
+    f'RETURNING {_TASK_COLUMNS}'
+)
+_SQL_GET_ALL = f'SELECT {_TASK_COLUMNS} FROM tasks ORDER BY id DESC'
+# Same result as _SQL_GET_ALL, but SQLite encodes it as a JSON array itself
+# so no per-row Python objects are built on the list endpoint. SQL leaves
+# aggregate input order unspecified; newest-first output relies on SQLite
+# running the ordered subquery as a co-routine and feeding json_group_array
+# in that scan order (covered by test_get_all_tasks_newest_first).
+_SQL_GET_ALL_JSON = (
+    "SELECT json_group_array(json_object("
+    "'id', id, 'title', title, 'description', description, "
+    "'due_date', due_date, 'status', status)) "
+    f"FROM ({_SQL_GET_ALL})"
+)
+_SQL_GET_BY_ID = f'SELECT {_TASK_COLUMNS} FROM tasks WHERE id = ?'
+_SQL_DELETE = 'DELETE FROM tasks WHERE id = ?'
+
+# Process-wide write connection, opened by init_db(); writes are serialized
+# through _write_lock. Each thread reads through its own connection so it
+# never sees a writer's uncommitted rows and WAL lets reads run alongside the
+# writer. Bumping _conn_epoch makes threads reopen their read connection.
+_CONN: Optional[sqlite3.Connection] = None
+_write_lock = threading.Lock()
+_local = threading.local()
+_read_conns: List[sqlite3.Connection] = []
+_read_conns_lock = threading.Lock()
+_conn_epoch = 0
+_init_lock = threading.Lock()
+
+# Read-through cache for task queries, keyed on (sql, params). Any committed
+# or rolled-back write clears it; set QUERY_CACHE_TTL to 0 to disable. At most
+# QUERY_CACHE_MAX_ENTRIES results are kept. Cached objects are shared between
+# callers, so callers must not mutate what the read functions return.
+QUERY_CACHE_TTL = 5.0
+QUERY_CACHE_MAX_ENTRIES = 1024
+_query_cache: Dict[Tuple, Tuple[float, Any]] = {}
+_cache_generation = 0
+_cache_lock = threading.Lock()
+
+def _cached_query(key: Tuple, loader: Callable[[], Any]) -> Any:
+    """Return a fresh cached result for key, or call loader and cache it."""
+    if QUERY_CACHE_TTL <= 0:
+        return loader()
+    now = time.monotonic()
+    entry = _query_cache.get(key)
+    if entry is not None and now - entry[0] < QUERY_CACHE_TTL:
+        return entry[1]
+    generation = _cache_generation
+    result = loader()
+    with _cache_lock:
+        # Don't store results that raced with a write
+        if generation == _cache_generation:
+            if len(_query_cache) >= QUERY_CACHE_MAX_ENTRIES:
+                _prune_cache(now)
+            _query_cache[key] = (now, result)
+    return result
+
+def _prune_cache(now: float):
+    """Drop expired entries, then the oldest ones if the cache is still full.
+    
+    Must be called with _cache_lock held.
+    """
+    for key in [k for k, (ts, _) in _query_cache.items() if now - ts >= QUERY_CACHE_TTL]:
+        del _query_cache[key]
+    while len(_query_cache) >= QUERY_CACHE_MAX_ENTRIES:
+        del _query_cache[next(iter(_query_cache))]
+
+def _invalidate_cache():
+    """Drop every cached query result."""
+    global _cache_generation
+    with _cache_lock:
+        _cache_generation += 1
+        _query_cache.clear()
+
+def _open_connection() -> sqlite3.Connection:
+    """Open a connection suitable for sharing across request threads."""
+    conn = sqlite3.connect(DATABASE_PATH, check_same_thread=False,
+                           isolation_level=None,
+                           cached_statements=STATEMENT_CACHE_SIZE)
+    conn.row_factory = sqlite3.Row
+    for pragma in _CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    if DATABASE_PATH != ':memory:':
+        for pragma in _FILE_PRAGMAS:
+            conn.execute(pragma)
+    return conn
+
+def _read_connection() -> sqlite3.Connection:
+    """Return this thread's read connection, opening it if needed."""
+    conn = getattr(_local, 'conn', None)
+    if conn is None or _local.epoch != _conn_epoch:
+        conn = _open_connection()
+        _local.conn = conn
+        _local.epoch = _conn_epoch
+        with _read_conns_lock:
+            _read_conns.append(conn)
+    return conn
+
+@atexit.register
+def close_db():
+    """Close the write connection and every thread's read connection."""
+    global _CONN, _conn_epoch
+    with _write_lock:
+        if _CONN is not None:
+            _CONN.close()
+            _CONN = None
+        with _read_conns_lock:
+            _conn_epoch += 1
+            for conn in _read_conns:
+                conn.close()
+            _read_conns.clear()
+
+def configure(path: str, cache_ttl: Optional[float] = None):
+    """Point the module at the database file at path.
+    
+    Closes any open connection and clears the query cache; call init_db()
+    afterwards to open the new database. cache_ttl overrides QUERY_CACHE_TTL.
+    """
+    global DATABASE_PATH, QUERY_CACHE_TTL
+    close_db()
+    DATABASE_PATH = path
+    if cache_ttl is not None:
+        QUERY_CACHE_TTL = cache_ttl
+    _invalidate_cache()
+
+def _lazy_init() -> sqlite3.Connection:
+    """Initialize DATABASE_PATH on first use if init_db() has not run."""
+    with _init_lock:
+        if _CONN is None:
+            init_db()
+        return _CONN
+
 @contextmanager
-def get_db_connection():
-    """Context manager for database connections."""
-    conn = None
-    try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        conn.row_factory = sqlite3.Row
-        yield conn
-        conn.commit()
-    except Exception as e:
-        if conn:
-            conn.rollback()
-        logger.error(f"Database error: {str(e)}")
-        raise
-    finally:
-        if conn:
-            conn.close()
+def get_db_connection(write: bool = False):
+    """Context manager yielding a database connection.
+
+    Reads get the calling thread's own connection. With write=True the
+    block runs on the shared write connection under the write lock, inside
+    an IMMEDIATE transaction that is committed on success and rolled back
+    on error.
+    """
+    conn = _CONN
+    if conn is None:
+        conn = _lazy_init()
+    if not write:
+        try:
+            if DATABASE_PATH == ':memory:':
+                # Every ':memory:' connection is a separate database, so
+                # reads must share the write connection and its lock.
+                with _write_lock:
+                    yield conn
+            else:
+                yield _read_connection()
+        except Exception as e:
+            logger.error("Database error: %s", e)
+            raise
+        return
+    with _write_lock:
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+            conn.execute('COMMIT')
+        except Exception as e:
+            conn.execute('ROLLBACK')
+            logger.error("Database error: %s", e)
+            raise
+        finally:
+            _invalidate_cache()
 
 def init_db():
     """Initialize the database with the tasks table."""
+    global _CONN
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
+        close_db()
+        _CONN = _open_connection()
+        with get_db_connection(write=True) as conn:
+            conn.execute('''
                 CREATE TABLE IF NOT EXISTS tasks (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     title TEXT NOT NULL,
@@ -39,72 +215,88 @@ def init_db():
                     status TEXT NOT NULL DEFAULT 'pending'
                 )
             ''')
+            # ORDER BY id DESC is served by a reverse scan of the rowid
+            # b-tree (no temp sort), so id needs no extra index.
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status)')
             logger.info("Database initialized successfully")
     except Exception as e:
-        logger.error(f"Failed to initialize database: {str(e)}")
+        logger.error("Failed to initialize database: %s", e)
         raise
 
 def create_task(title: str, description: Optional[str] = None, 
-                due_date: Optional[str] = None, status: str = 'pending') -> int:
-    """Create a new task and return its ID."""
+                due_date: Optional[str] = None, status: str = 'pending') -> Dict[str, Any]:
+    """Create a new task and return it as stored."""
+    try:
+        with get_db_connection(write=True) as conn:
+            task = dict(conn.execute(_SQL_INSERT, (title, description, due_date, status)).fetchone())
+            logger.debug("Task created with ID: %s", task['id'])
+            return task
+    except Exception as e:
+        logger.error("Failed to create task: %s", e)
+        raise
+
+def create_tasks(tasks: List[Tuple[str, Optional[str], Optional[str], str]]) -> List[Dict[str, Any]]:
+    """Create several tasks in one transaction and return them as stored.
+    
+    Each entry is a (title, description, due_date, status) tuple.
+    """
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                'INSERT INTO tasks (title, description, due_date, status) VALUES (?, ?, ?, ?)',
-                (title, description, due_date, status)
-            )
-            task_id = cursor.lastrowid
-            logger.info(f"Task created with ID: {task_id}")
-            return task_id
+        with get_db_connection(write=True) as conn:
+            created = []
+            # executemany() discards RETURNING rows, so insert row by row
+            # inside the single transaction instead.
+            for params in tasks:
+                created.append(dict(conn.execute(_SQL_INSERT, params).fetchone()))
+            logger.debug("Created %s tasks in batch", len(created))
+            return created
     except Exception as e:
-        logger.error(f"Failed to create task: {str(e)}")
+        logger.error("Failed to create tasks in batch: %s", e)
         raise
 
-def get_all_tasks() -> List[Dict[str, Any]]:
-    """Retrieve all tasks from the database."""
+def _query_task(task_id: int) -> Optional[Dict[str, Any]]:
+    """Fetch a single task by ID, bypassing the query cache."""
+    with get_db_connection() as conn:
+        row = conn.execute(_SQL_GET_BY_ID, (task_id,)).fetchone()
+        return dict(row) if row else None
+
+def _query_all_tasks_json() -> bytes:
+    """Fetch all tasks as a UTF-8 JSON array, bypassing the query cache."""
+    with get_db_connection() as conn:
+        return conn.execute(_SQL_GET_ALL_JSON).fetchone()[0].encode('utf-8')
+
+def get_all_tasks_json() -> bytes:
+    """Retrieve all tasks, newest first, already serialized as JSON."""
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT * FROM tasks ORDER BY id DESC')
-            rows = cursor.fetchall()
-            tasks = [dict(row) for row in rows]
-            logger.info(f"Retrieved {len(tasks)} tasks")
-            return tasks
+        payload = _cached_query((_SQL_GET_ALL_JSON,), _query_all_tasks_json)
+        logger.debug("Retrieved all tasks as JSON")
+        return payload
     except Exception as e:
-        logger.error(f"Failed to retrieve tasks: {str(e)}")
+        logger.error("Failed to retrieve tasks: %s", e)
         raise
 
 def get_task_by_id(task_id: int) -> Optional[Dict[str, Any]]:
-    """Retrieve a specific task by ID."""
+    """Retrieve a specific task by ID.
+    
+    The returned dict may be shared with other callers via the query cache
+    and must not be mutated.
+    """
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT * FROM tasks WHERE id = ?', (task_id,))
-            row = cursor.fetchone()
-            if row:
-                logger.info(f"Retrieved task with ID: {task_id}")
-                return dict(row)
-            logger.warning(f"Task with ID {task_id} not found")
-            return None
+        task = _cached_query((_SQL_GET_BY_ID, task_id), lambda: _query_task(task_id))
+        if task:
+            logger.debug("Retrieved task with ID: %s", task_id)
+            return task
+        logger.warning("Task with ID %s not found", task_id)
+        return None
     except Exception as e:
-        logger.error(f"Failed to retrieve task {task_id}: {str(e)}")
+        logger.error("Failed to retrieve task %s: %s", task_id, e)
         raise
 
 def update_task(task_id: int, title: Optional[str] = None, 
                 description: Optional[str] = None, due_date: Optional[str] = None, 
-                status: Optional[str] = None) -> bool:
-    """Update an existing task. Returns True if successful, False if task not found."""
+                status: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Update an existing task. Returns the updated task, or None if not found."""
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            # First check if task exists
-            cursor.execute('SELECT id FROM tasks WHERE id = ?', (task_id,))
-            if not cursor.fetchone():
-                logger.warning(f"Task with ID {task_id} not found for update")
-                return False
-            
+        with get_db_connection(write=True) as conn:
             # Build dynamic update query
             updates = []
             params = []
@@ -124,28 +316,32 @@ def update_task(task_id: int, title: Optional[str] = None,
             
             if updates:
                 params.append(task_id)
-                query = f"UPDATE tasks SET {', '.join(updates)} WHERE id = ?"
-                cursor.execute(query, params)
-                logger.info(f"Task {task_id} updated successfully")
-                return True
+                query = f"UPDATE tasks SET {', '.join(updates)} WHERE id = ? RETURNING {_TASK_COLUMNS}"
+                row = conn.execute(query, params).fetchone()
+            else:
+                # Nothing to change; just return the current row
+                row = conn.execute(_SQL_GET_BY_ID, (task_id,)).fetchone()
+            
+            if row is None:
+                logger.warning("Task with ID %s not found for update", task_id)
+                return None
             
-            return True
+            logger.debug("Task %s updated successfully", task_id)
+            return dict(row)
     except Exception as e:
-        logger.error(f"Failed to update task {task_id}: {str(e)}")
+        logger.error("Failed to update task %s: %s", task_id, e)
         raise
 
 def delete_task(task_id: int) -> bool:
     """Delete a task by ID. Returns True if successful, False if task not found."""
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('DELETE FROM tasks WHERE id = ?', (task_id,))
-            deleted = cursor.rowcount > 0
+        with get_db_connection(write=True) as conn:
+            deleted = conn.execute(_SQL_DELETE, (task_id,)).rowcount > 0
             if deleted:
-                logger.info(f"Task {task_id} deleted successfully")
+                logger.debug("Task %s deleted successfully", task_id)
             else:
-                logger.warning(f"Task with ID {task_id} not found for deletion")
+                logger.warning("Task with ID %s not found for deletion", task_id)
             return deleted
     except Exception as e:
-        logger.error(f"Failed to delete task {task_id}: {str(e)}")
+        logger.error("Failed to delete task %s: %s", task_id, e)
         raise
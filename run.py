@@ -1,9 +1,13 @@
 """
 Application runner script.
-This script starts the Flask application.
+This script starts the Flask application. By default it is served by the
+threaded waitress server (see serve.py); set DEV_RELOAD=1 to use Flask's
+debug server with auto-reload instead.
 """
 
-from app.app import app
+import os
+
+from app.app import create_app
 
 if __name__ == '__main__':
     print("=" * 60)
@@ -14,4 +18,8 @@ if __name__ == '__main__':
     print("Press Ctrl+C to stop the server\n")
     print("=" * 60)
     
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    if os.getenv('DEV_RELOAD'):
+        create_app('tasks.db').run(debug=True, host='0.0.0.0', port=5000)
+    else:
+        from serve import main
+        main()
@@ -0,0 +1,22 @@
+"""
+Production server script.
+This script serves the Flask application with waitress, a multi-threaded
+WSGI server, so requests are handled concurrently. Each request thread reads
+through its own SQLite connection, and WAL journaling lets those reads run
+in parallel with each other and with the single, lock-serialized writer.
+"""
+
+from waitress import serve
+
+from app.app import create_app
+
+HOST = '0.0.0.0'
+PORT = 5000
+THREADS = 8
+
+def main():
+    """Initialize the application and serve it until interrupted."""
+    serve(create_app('tasks.db'), host=HOST, port=PORT, threads=THREADS)
+
+if __name__ == '__main__':
+    main()
@@ -17,7 +17,7 @@ def client():
     
     # Use a separate test database
     import app.database as db
-    db.DATABASE_PATH = 'test_tasks.db'
+    db.configure('test_tasks.db', cache_ttl=0)
     
     # Initialize the test database
     init_db()
@@ -26,10 +26,12 @@ def client():
         yield client
     
     # Clean up test database after tests
-    try:
-        os.remove('test_tasks.db')
-    except:
-        pass
+    db.close_db()
+    for path in ('test_tasks.db', 'test_tasks.db-wal', 'test_tasks.db-shm'):
+        try:
+            os.remove(path)
+        except:
+            pass
 
 @pytest.fixture
 def sample_task():
@@ -41,6 +43,38 @@ def sample_task():
         'status': 'pending'
     }
 
+class TestIndex:
+    """Tests for the GET / web interface page."""
+    
+    def test_index_etag(self, client):
+        """Test that the page is served with an ETag and revalidates."""
+        response = client.get('/')
+        
+        assert response.status_code == 200
+        assert response.mimetype == 'text/html'
+        etag = response.headers['ETag']
+        
+        response = client.get('/', headers={'If-None-Match': etag})
+        assert response.status_code == 304
+    
+    def test_index_script_root(self, client):
+        """Test that static URLs honour a SCRIPT_NAME prefix."""
+        response = client.get('/', environ_overrides={'SCRIPT_NAME': '/todo'})
+        
+        assert response.status_code == 200
+        assert b'/todo/static/style.css' in response.data
+    
+    def test_index_cache_bounded(self, client):
+        """Test that only a bounded number of script roots are cached."""
+        import app.app as app_module
+        for i in range(app_module.INDEX_CACHE_MAX_ROOTS + 5):
+            prefix = f'/prefix{i}'
+            response = client.get('/', environ_overrides={'SCRIPT_NAME': prefix})
+            assert response.status_code == 200
+            assert f'{prefix}/static/style.css'.encode() in response.data
+        
+        assert len(app_module._index_cache) <= app_module.INDEX_CACHE_MAX_ROOTS
+
 class TestCreateTask:
     """Tests for POST /api/tasks endpoint."""
     
@@ -68,6 +102,17 @@ class TestCreateTask:
         data = json.loads(response.data)
         assert 'error' in data
     
+    def test_create_task_invalid_json(self, client):
+        """Test task creation with a body that is not valid JSON."""
+        for body in ('{"title": "Test"', '{"title": "Test", "n": 1e999}'):
+            response = client.post('/api/tasks',
+                                   data=body,
+                                   content_type='application/json')
+            
+            assert response.status_code == 400
+            data = json.loads(response.data)
+            assert data['error'] == 'Invalid JSON'
+    
     def test_create_task_missing_title(self, client):
         """Test task creation without title."""
         task_data = {'description': 'Test description'}
@@ -98,10 +143,41 @@ class TestCreateTask:
                                data=json.dumps(task_data),
                                content_type='application/json')
         
+        assert response.status_code == 400
+        data = json.loads(response.data)
+        assert data['error'] == 'Status must be one of: pending, in_progress, completed'
+    
+    def test_create_task_non_object_body(self, client):
+        """Test task creation with a JSON body that is not an object."""
+        response = client.post('/api/tasks',
+                               data=json.dumps(['Test']),
+                               content_type='application/json')
+        
         assert response.status_code == 400
         data = json.loads(response.data)
         assert 'error' in data
-        assert 'status' in data['error'].lower()
+    
+    def test_create_task_invalid_description_type(self, client):
+        """Test task creation with a non-string description."""
+        task_data = {'title': 'Test', 'description': 5}
+        response = client.post('/api/tasks',
+                               data=json.dumps(task_data),
+                               content_type='application/json')
+        
+        assert response.status_code == 400
+        data = json.loads(response.data)
+        assert 'description' in data['error'].lower()
+    
+    def test_create_task_null_title(self, client):
+        """Test task creation with a null title."""
+        task_data = {'title': None}
+        response = client.post('/api/tasks',
+                               data=json.dumps(task_data),
+                               content_type='application/json')
+        
+        assert response.status_code == 400
+        data = json.loads(response.data)
+        assert data['error'] == 'Title is required'
     
     def test_create_task_minimal_data(self, client):
         """Test task creation with only required fields."""
@@ -115,6 +191,75 @@ class TestCreateTask:
         assert data['title'] == 'Minimal Task'
         assert data['status'] == 'pending'
 
+class TestCreateTasksBatch:
+    """Tests for POST /api/tasks/batch endpoint."""
+    
+    def test_create_tasks_batch_success(self, client, sample_task):
+        """Test creating several tasks in one request."""
+        task2 = {'title': 'Second Task'}
+        response = client.post('/api/tasks/batch',
+                               data=json.dumps({'tasks': [sample_task, task2]}),
+                               content_type='application/json')
+        
+        assert response.status_code == 201
+        data = json.loads(response.data)
+        assert len(data) == 2
+        assert data[0]['title'] == sample_task['title']
+        assert data[1]['title'] == 'Second Task'
+        assert data[1]['status'] == 'pending'
+        
+        response = client.get('/api/tasks')
+        assert len(json.loads(response.data)) == 2
+    
+    def test_create_tasks_batch_no_tasks(self, client):
+        """Test batch creation with an empty task list."""
+        response = client.post('/api/tasks/batch',
+                               data=json.dumps({'tasks': []}),
+                               content_type='application/json')
+        
+        assert response.status_code == 400
+        data = json.loads(response.data)
+        assert 'error' in data
+    
+    def test_create_tasks_batch_invalid_entry(self, client, sample_task):
+        """Test that one invalid entry rejects the whole batch."""
+        bad_task = {'title': 'Bad', 'status': 'invalid_status'}
+        response = client.post('/api/tasks/batch',
+                               data=json.dumps({'tasks': [sample_task, bad_task]}),
+                               content_type='application/json')
+        
+        assert response.status_code == 400
+        data = json.loads(response.data)
+        assert 'status' in data['error'].lower()
+        
+        response = client.get('/api/tasks')
+        assert json.loads(response.data) == []
+    
+    def test_create_tasks_batch_non_object_entry(self, client):
+        """Test batch creation with an entry that is not an object."""
+        response = client.post('/api/tasks/batch',
+                               data=json.dumps({'tasks': [5]}),
+                               content_type='application/json')
+        
+        assert response.status_code == 400
+        data = json.loads(response.data)
+        assert data['error'] == 'Task 0: Task must be a JSON object'
+    
+    def test_create_tasks_batch_too_large(self, client):
+        """Test that batches over the size limit are rejected."""
+        from app.app import MAX_BATCH_SIZE
+        tasks = [{'title': f'Task {i}'} for i in range(MAX_BATCH_SIZE + 1)]
+        response = client.post('/api/tasks/batch',
+                               data=json.dumps({'tasks': tasks}),
+                               content_type='application/json')
+        
+        assert response.status_code == 400
+        data = json.loads(response.data)
+        assert 'error' in data
+        
+        response = client.get('/api/tasks')
+        assert json.loads(response.data) == []
+
 class TestGetAllTasks:
     """Tests for GET /api/tasks endpoint."""
     
@@ -127,6 +272,16 @@ class TestGetAllTasks:
         assert isinstance(data, list)
         assert len(data) == 0
     
+    def test_get_all_tasks_without_init(self, client):
+        """Test that the database is initialized lazily on first use."""
+        import app.database as db
+        db.configure('test_tasks.db', cache_ttl=0)
+        
+        response = client.get('/api/tasks')
+        
+        assert response.status_code == 200
+        assert json.loads(response.data) == []
+    
     def test_get_all_tasks_with_data(self, client, sample_task):
         """Test retrieving tasks when database has data."""
         # Create some tasks
@@ -146,6 +301,25 @@ class TestGetAllTasks:
         data = json.loads(response.data)
         assert isinstance(data, list)
         assert len(data) == 2
+    
+    def test_get_all_tasks_newest_first(self, client, sample_task):
+        """Test that tasks are listed newest first."""
+        client.post('/api/tasks',
+                   data=json.dumps(sample_task),
+                   content_type='application/json')
+        
+        task2 = sample_task.copy()
+        task2['title'] = 'Second Task'
+        client.post('/api/tasks',
+                   data=json.dumps(task2),
+                   content_type='application/json')
+        
+        response = client.get('/api/tasks')
+        
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data[0]['title'] == 'Second Task'
+        assert data[1]['title'] == sample_task['title']
 
 class TestGetSingleTask:
     """Tests for GET /api/tasks/<id> endpoint."""
@@ -247,6 +421,7 @@ class TestUpdateTask:
         assert response.status_code == 400
         data = json.loads(response.data)
         assert 'error' in data
+        assert data['error'] == 'Title cannot be empty'
     
     def test_update_task_invalid_status(self, client, sample_task):
         """Test updating task with invalid status."""
@@ -317,6 +492,29 @@ class TestDeleteTask:
         data = json.loads(response.data)
         assert 'error' in data
 
+class TestQueryCache:
+    """Tests for the read cache on GET endpoints."""
+    
+    def test_cache_invalidated_on_write(self, client, sample_task):
+        """Test that writes are visible immediately with caching enabled."""
+        import app.database as db
+        db.QUERY_CACHE_TTL = 60
+        try:
+            assert json.loads(client.get('/api/tasks').data) == []
+            
+            create_response = client.post('/api/tasks',
+                                          data=json.dumps(sample_task),
+                                          content_type='application/json')
+            task_id = json.loads(create_response.data)['id']
+            assert len(json.loads(client.get('/api/tasks').data)) == 1
+            assert client.get(f'/api/tasks/{task_id}').status_code == 200
+            
+            client.delete(f'/api/tasks/{task_id}')
+            assert json.loads(client.get('/api/tasks').data) == []
+            assert client.get(f'/api/tasks/{task_id}').status_code == 404
+        finally:
+            db.QUERY_CACHE_TTL = 0
+
 class TestIntegration:
     """Integration tests for complete workflows."""
     